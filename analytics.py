@@ -4,7 +4,7 @@ from pyvis.network import Network
 import plotly.graph_objects as go
 import streamlit as st
 
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=3600, max_entries=8)
 def perform_topic_clustering(df: pd.DataFrame, n_topics: int = 5) -> pd.DataFrame:
     """
     Perform topic clustering on articles using LDA.
@@ -1,4 +1,7 @@
-import xml.etree.ElementTree as ET
+try:
+    from lxml import etree as ET  # C-basierter Parser, deutlich schneller bei großen Sitemaps
+except ImportError:
+    import xml.etree.ElementTree as ET
 import requests
 import pandas as pd
 import streamlit as st
@@ -10,22 +13,26 @@ from io import BytesIO
 from sitemaps import SITEMAP_LIBRARY
 from kategorien import BEKANNTE_KATEGORIEN
 
+# Maximale Wartezeit pro Sitemap-Abruf in Sekunden, damit ein hängender Server die Seite nicht blockiert
+SITEMAP_TIMEOUT = 10
+
+# Gemeinsame HTTP-Session für alle Sitemap-Abrufe (Keep-Alive statt neuer Verbindung pro Abruf)
+@st.cache_resource
+def hole_http_session():
+    session = requests.Session()
+    session.headers.update({'Accept-Encoding': 'gzip, deflate'})
+    return session
+
 # Funktion zum Laden einer einzelnen Sitemap
 def lade_einzelne_sitemap(xml_url):
     try:
-        response = requests.get(xml_url)
+        response = hole_http_session().get(xml_url, timeout=SITEMAP_TIMEOUT)
         response.raise_for_status()
         xml_content = response.content
     except requests.exceptions.RequestException as e:
         st.error(f"Fehler beim Herunterladen der XML-Datei: {e}")
         return pd.DataFrame()
 
-    try:
-        root = ET.fromstring(xml_content)
-    except ET.ParseError as e:
-        st.error(f"Fehler beim Parsen der XML-Datei: {e}")
-        return pd.DataFrame()
-
     namespaces = {
         'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9',
         'news': 'http://www.google.com/schemas/sitemap-news/0.9',
@@ -36,19 +43,30 @@ def lade_einzelne_sitemap(xml_url):
         'dc': 'http://purl.org/dc/elements/1.1/',
     }
 
+    # Einträge je Format: Sitemap-<url>, Atom-<entry> und RSS-<item>
+    verarbeiter = {
+        f"{{{namespaces['ns']}}}url": verarbeite_sitemap_url,
+        f"{{{namespaces['atom']}}}entry": verarbeite_atom_entry,
+        'item': verarbeite_rss_item,
+    }
+
     ergebnisse = []
 
-    if root.tag.endswith('urlset'):  # Sitemap
-        for url in root.findall('ns:url', namespaces):
-            ergebnisse.append(verarbeite_sitemap_url(url, namespaces))
-    elif root.tag.endswith('feed'):  # Atom-Feed
-        for entry in root.findall('atom:entry', namespaces):
-            ergebnisse.append(verarbeite_atom_entry(entry, namespaces))
-    elif root.tag == 'rss':  # RSS-Feed
-        channel = root.find('channel')
-        if channel is not None:
-            for item in channel.findall('item'):
-                ergebnisse.append(verarbeite_rss_item(item, namespaces))
+    # Streaming-Parsing: jeder Eintrag wird verarbeitet, sobald er vollständig gelesen ist,
+    # und danach freigegeben, statt zuerst den gesamten Baum im Speicher aufzubauen
+    try:
+        for _, element in ET.iterparse(BytesIO(xml_content), events=('end',)):
+            verarbeite = verarbeiter.get(element.tag)
+            if verarbeite is None:
+                continue
+            ergebnisse.append(verarbeite(element, namespaces))
+            element.clear()
+            if hasattr(element, 'getprevious'):  # nur lxml kennt Geschwister-Zugriff
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+    except ET.ParseError as e:
+        st.error(f"Fehler beim Parsen der XML-Datei: {e}")
+        return pd.DataFrame()
 
     # Entfernen von leeren Ergebnissen
     ergebnisse = [item for item in ergebnisse if item]
@@ -78,9 +96,11 @@ def verarbeite_sitemap_url(url, namespaces):
 def verarbeite_atom_entry(entry, namespaces):
     title = entry.find('atom:title', namespaces)
     link = entry.find('atom:link', namespaces)
-    pub_date = (entry.find('atom:published', namespaces) or
-                entry.find('atom:updated', namespaces) or
-                entry.find('dc:date', namespaces))
+    # Erstes vorhandenes Datumselement; Elemente ohne Kinder sind "falsy", daher kein `or`
+    pub_date = next((element for element in (entry.find('atom:published', namespaces),
+                                             entry.find('atom:updated', namespaces),
+                                             entry.find('dc:date', namespaces))
+                     if element is not None), None)
     summary = entry.find('atom:summary', namespaces)
     
     loc = link.get('href') if link is not None else None
@@ -172,7 +192,7 @@ def extrahiere_bild_daten(image_element, namespaces):
         daten['image_caption'] = caption.text
     return daten
 
-@st.cache_data
+@st.cache_data(ttl=3600, max_entries=len(SITEMAP_LIBRARY) + 1)
 def lade_daten(xml_urls):
     dfs = []
     progress_bar = st.progress(0)
@@ -1,23 +1,27 @@
-import base64
+from io import BytesIO
 import pandas as pd
 import streamlit as st
-from streamlit.runtime.caching import cache_data
-from helpers import (determine_feed_type, extract_urls_from_rss, extract_urls_from_sitemap,
-                     parse_datetime, parse_iso_datetime, extract_categories, normalize_categories, get_all_articles,
-                     REGIONAL_LOCATIONS)
+from helpers import (get_all_articles, build_category_matrix, count_categories,
+                     FEEDS, HELPER_COLUMNS, REGIONAL_LOCATION_SET, FEED_CACHE_TTL)
 
 # ----------------------------- Main Application ----------------------------- #
 
-@st.cache_data(ttl=3600)
-def cached_get_all_articles():
-    return get_all_articles()
+# The whole ingest pipeline (fetch, parse, normalize) runs once per TTL; widget
+# interactions only re-run the filters on the cached frame. The feed definitions are
+# passed in so that editing FEEDS invalidates the cache.
+@st.cache_data(ttl=FEED_CACHE_TTL, max_entries=1, show_spinner='Fetching feeds...')
+def cached_get_all_articles(feeds):
+    df, log_messages = get_all_articles(dict(feeds))
+    category_matrix = build_category_matrix(df['Normalized_Categories'])
+    # Category counts over all articles, reused for the filter options whenever no search is active
+    return df, log_messages, category_matrix, count_categories(category_matrix)
 
 def main():
     st.set_page_config(page_title='📰 News Feed Aggregator', layout='wide')
     st.title('📰 News Feed Aggregator')
 
-    # Retrieve all articles and log messages
-    df, log_messages = cached_get_all_articles()
+    # Retrieve all articles, log messages, the one-hot category matrix and its counts
+    df, log_messages, category_matrix, category_counts = cached_get_all_articles(tuple(FEEDS.items()))
 
     # Sidebar: Processing Log
     with st.sidebar.expander("🗒 Processing Log", expanded=False):
@@ -29,49 +33,35 @@ def main():
     # Sidebar: Filters
     st.sidebar.title("🔍 Filters")
 
-    # 1. Category Filter Logic
-    filter_logic = st.sidebar.radio(
-        'Category Filter Logic:',
-        options=['AND', 'OR'],
-        index=0,  # Default to 'AND'
-        key='filter_logic_radio'
-    )
+    # Widgets inside the filter form only report new values on submit, so the option
+    # lists below are derived from the last submitted search term
+    combined_search = st.session_state.get('combined_search_input', '')
 
-    st.sidebar.markdown("")  # Space
+    # Filters are collected as boolean masks over df; the frame itself is only indexed
+    # once, after all filters have been combined
+    search_mask = pd.Series(True, index=df.index)
 
-    # 2. Search by Title or Keywords
-    combined_search = st.sidebar.text_input(
-        'Search by Title or Keywords:',
-        value='',
-        key='combined_search_input'
-    )
+    if combined_search:
+        search_query = combined_search.lower()
+        # Literal (non-regex) match, so characters like '(' or '+' in the query are safe
+        search_mask = df['Search_Text'].str.contains(search_query, regex=False)
 
-    st.sidebar.markdown("")  # Space
+    # Determine available categories and locations based on current filters: the cached
+    # counts without a search, otherwise column sums of the matching rows of the matrix
+    if combined_search:
+        available_categories = count_categories(category_matrix[search_mask])
+    else:
+        available_categories = category_counts
 
-    # Apply combined search filter first
-    filtered_df = df.copy()
+    # One hashed membership pass splits the counts into locations and general categories
+    is_location = available_categories.index.isin(REGIONAL_LOCATION_SET)
+    available_locations = available_categories[is_location]
+    available_categories = available_categories[~is_location]
 
-    if combined_search:
-        search_query = combined_search.lower()
-        filtered_df = filtered_df[
-            filtered_df['Keywords'].str.lower().str.contains(search_query, na=False) |
-            filtered_df['Title'].str.lower().str.contains(search_query, na=False)
-        ]
-
-    # Determine available categories and locations based on current filters
-    available_categories = (
-        filtered_df['Normalized_Categories']
-        .explode()
-        .dropna()
-        .value_counts()
-    )
-
-    available_locations = available_categories.loc[lambda x: x.index.isin(REGIONAL_LOCATIONS)]
-    available_categories = available_categories.loc[lambda x: ~x.index.isin(REGIONAL_LOCATIONS)]
-
-    # Prepare filter options with counts
-    category_options = [f"{cat} ({count})" for cat, count in available_categories.items()]
-    location_options = [f"{loc} ({count})" for loc, count in available_locations.items()]
+    # Options are the bare category and location names; the counts are only shown through
+    # format_func, so a selection stays valid when a new search changes the counts
+    category_options = available_categories.index.tolist()
+    location_options = available_locations.index.tolist()
 
     # Retrieve previous selections and filter them to ensure they are still valid
     previous_selected_categories = st.session_state.get('selected_categories', [])
@@ -80,53 +70,65 @@ def main():
     previous_selected_locations = st.session_state.get('selected_locations', [])
     selected_locations = [loc for loc in previous_selected_locations if loc in location_options]
 
-    # Sidebar: Multiselects for categories and locations
-    selected_categories = st.sidebar.multiselect(
-        'Select Categories:',
-        options=category_options,
-        default=selected_categories,
-        key='category_multiselect'
-    )
-
-    selected_locations = st.sidebar.multiselect(
-        'Select Regional Locations:',
-        options=location_options,
-        default=selected_locations,
-        key='location_multiselect'
-    )
+    # Group all filters in one form so they are applied together on submit
+    # instead of triggering a full rerun per widget change
+    with st.sidebar.form('filters'):
+        # 1. Category Filter Logic
+        filter_logic = st.radio(
+            'Category Filter Logic:',
+            options=['AND', 'OR'],
+            index=0,  # Default to 'AND'
+            key='filter_logic_radio'
+        )
+
+        st.markdown("")  # Space
+
+        # 2. Search by Title or Keywords
+        st.text_input(
+            'Search by Title or Keywords:',
+            value='',
+            key='combined_search_input'
+        )
+
+        st.markdown("")  # Space
+
+        # 3. Multiselects for categories and locations
+        selected_categories = st.multiselect(
+            'Select Categories:',
+            options=category_options,
+            format_func=lambda cat: f"{cat} ({available_categories[cat]})",
+            default=selected_categories,
+            key='category_multiselect'
+        )
+
+        selected_locations = st.multiselect(
+            'Select Regional Locations:',
+            options=location_options,
+            format_func=lambda loc: f"{loc} ({available_locations[loc]})",
+            default=selected_locations,
+            key='location_multiselect'
+        )
+
+        st.form_submit_button('Apply Filters')
 
     # Update session state with current selections
     st.session_state['selected_categories'] = selected_categories
     st.session_state['selected_locations'] = selected_locations
 
-    # Extract actual category and location names from selected items
-    selected_categories_clean = [cat.split(' (')[0] for cat in selected_categories]
-    selected_locations_clean = [loc.split(' (')[0] for loc in selected_locations]
+    # Combine the category and location filter with the search mask.
+    # OR: an article matches any selected category or location;
+    # AND: an article carries every selected category and location.
+    selected_clean = selected_categories + selected_locations
+    mask = search_mask
 
-    # Apply category and location filters
-    filtered_df_final = filtered_df.copy()
-
-    if selected_categories_clean or selected_locations_clean:
+    if selected_clean:
+        selected_matrix = category_matrix[selected_clean]
         if filter_logic == 'OR':
-            condition = (
-                filtered_df_final['Normalized_Categories'].apply(
-                    lambda cats: any(cat in cats for cat in selected_categories_clean)
-                ) if selected_categories_clean else pd.Series([False] * len(filtered_df_final))
-            )
-            if selected_locations_clean:
-                condition |= filtered_df_final['Normalized_Categories'].apply(
-                    lambda locs: any(loc in locs for loc in selected_locations_clean)
-                )
-            filtered_df_final = filtered_df_final[condition]
-        elif filter_logic == 'AND':
-            if selected_categories_clean:
-                filtered_df_final = filtered_df_final[
-                    filtered_df_final['Normalized_Categories'].apply(lambda cats: all(cat in cats for cat in selected_categories_clean))
-                ]
-            if selected_locations_clean:
-                filtered_df_final = filtered_df_final[
-                    filtered_df_final['Normalized_Categories'].apply(lambda locs: all(loc in locs for loc in selected_locations_clean))
-                ]
+            mask = mask & selected_matrix.any(axis=1)
+        else:
+            mask = mask & selected_matrix.all(axis=1)
+
+    filtered_df_final = df[mask]
 
     # Sort the DataFrame by the newest publication date
     filtered_df_final = filtered_df_final.sort_values(by='Publication_Date', ascending=False)
@@ -134,27 +136,31 @@ def main():
     # Display the number of articles found
     st.subheader(f"🔍 Number of articles found: {len(filtered_df_final)}")
 
-    # Display the DataFrame
-    st.dataframe(filtered_df_final)
+    # Display the DataFrame without the precomputed helper columns used for filters and charts
+    display_columns = [col for col in filtered_df_final.columns if col not in HELPER_COLUMNS]
+    st.dataframe(filtered_df_final, column_order=display_columns)
 
-    # Download filtered articles as CSV
+    # Download filtered articles as CSV. The CSV is only generated when the button is
+    # clicked (data is a callable), not on every rerun; 'ignore' skips the rerun on click
     if not filtered_df_final.empty:
-        csv = filtered_df_final.to_csv(index=False)
-        b64 = base64.b64encode(csv.encode()).decode()
-        href = f'<a href="data:file/csv;base64,{b64}" download="filtered_articles.csv">💾 Download CSV</a>'
-        st.markdown(href, unsafe_allow_html=True)
+        def filtered_articles_csv() -> bytes:
+            csv_buffer = BytesIO()
+            filtered_df_final.to_csv(csv_buffer, index=False, columns=display_columns, encoding='utf-8')
+            return csv_buffer.getvalue()
+
+        st.download_button(
+            '💾 Download CSV',
+            data=filtered_articles_csv,
+            file_name='filtered_articles.csv',
+            mime='text/csv',
+            on_click='ignore'
+        )
 
     # Visual Insights
     st.subheader("📊 Visual Insights")
 
     # Bar chart for Top 25 General Categories
-    top_25_categories = (
-        filtered_df_final['Normalized_Categories']
-        .explode()
-        .dropna()
-        .value_counts()
-        .head(25)
-    )
+    top_25_categories = count_categories(category_matrix[mask]).head(25)
     if not top_25_categories.empty:
         st.markdown("**Top 25 Categories by Number of Articles**")
         category_df = top_25_categories.rename_axis('Category').reset_index(name='Count')
@@ -165,7 +171,6 @@ def main():
 
     # Bar chart for Articles Published Each Hour
     if not filtered_df_final.empty and filtered_df_final['Publication_Date'].notna().any():
-        filtered_df_final['Hour'] = filtered_df_final['Publication_Date'].dt.hour
         articles_per_hour = filtered_df_final['Hour'].value_counts().sort_index()
         st.markdown("**Number of Articles Published Each Hour**")
         st.bar_chart(articles_per_hour)
@@ -174,6 +179,7 @@ def main():
 
     # Distribution of Feeds
     feed_counts = filtered_df_final['Feed'].value_counts()
+    feed_counts = feed_counts[feed_counts > 0]  # Categorical counts include feeds without matches
     if not feed_counts.empty:
         st.markdown("**Distribution of Feeds**")
         st.write(feed_counts)
@@ -1,24 +1,32 @@
+import hashlib
+import json
+import os
 import re
-import xml.etree.ElementTree as ET
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Tuple
-from urllib.parse import urlparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
 
 import feedparser
 import pandas as pd
 import requests
-import streamlit as st
+from lxml import etree
+from requests.adapters import HTTPAdapter
 
 # ----------------------------- Configuration ----------------------------- #
 
-FEEDS: Dict[str, str] = {
-    'Stern.de News Sitemap': 'https://www.stern.de/736974656d6170-news.xml',
-    'Welt.de News Sitemap': 'https://www.welt.de/sitemaps/newssitemap/newssitemap.xml',
-    'Spiegel.de News Sitemap': 'https://www.spiegel.de/sitemaps/news-de.xml',
-    'Focus.de Politik News Sitemap': 'https://www.focus.de/sitemap_news_politik.xml',
-    'Bild.de News Sitemap': 'https://www.bild.de/sitemap-news.xml',
-    'Tagesschau.de RSS Feed': 'https://www.tagesschau.de/index~rss2.xml',
-    'T-Online.de RSS Feed': 'https://www.t-online.de/schlagzeilen/feed.rss'
+# Feed name -> (feed type, URL). The type is known up front, so it is not re-detected on
+# every run; use None to have it sniffed from the downloaded body instead.
+FEEDS: Dict[str, Tuple[Optional[str], str]] = {
+    'Stern.de News Sitemap': ('sitemap', 'https://www.stern.de/736974656d6170-news.xml'),
+    'Welt.de News Sitemap': ('sitemap', 'https://www.welt.de/sitemaps/newssitemap/newssitemap.xml'),
+    'Spiegel.de News Sitemap': ('sitemap', 'https://www.spiegel.de/sitemaps/news-de.xml'),
+    'Focus.de Politik News Sitemap': ('sitemap', 'https://www.focus.de/sitemap_news_politik.xml'),
+    'Bild.de News Sitemap': ('sitemap', 'https://www.bild.de/sitemap-news.xml'),
+    'Tagesschau.de RSS Feed': ('rss', 'https://www.tagesschau.de/index~rss2.xml'),
+    'T-Online.de RSS Feed': ('rss', 'https://www.t-online.de/schlagzeilen/feed.rss')
 }
 
 STATES_OF_GERMANY: List[str] = [
@@ -47,6 +55,9 @@ REGIONAL_LOCATIONS: List[str] = sorted(
     reverse=True
 )
 
+# Set of the same locations for O(1) membership tests (e.g. splitting filter options)
+REGIONAL_LOCATION_SET: FrozenSet[str] = frozenset(REGIONAL_LOCATIONS)
+
 NORMALIZATION_RULES: Dict[str, List[str]] = {
     'wirtschaft': ['economy', 'wirtschaft'],
     'politik': ['politics', 'politik'],
@@ -56,135 +67,365 @@ NORMALIZATION_RULES: Dict[str, List[str]] = {
     'nordrhein-westfalen': ['nordrhein-westfalen', 'nrw', 'ruhrgebiet']
 }
 
-NON_CATEGORY_PATTERNS: List[str] = [
-    r'^article\d+$',
-    r'^plus\d+$',
-    r'^amp\d+$',
-    r'^content\d+$',
-    r'^rss\d+$',
-    r'^id_\d+$'
-]
+# Path segments made of one of these prefixes followed only by digits are article or
+# tracking ids, not categories
+NON_CATEGORY_PREFIXES: Tuple[str, ...] = ('article', 'plus', 'amp', 'content', 'rss', 'id_')
+
+# One anchored pattern with the shared digits suffix factored out, so each segment is
+# matched once against the prefix alternation
+NON_CATEGORY_RE = re.compile(
+    r'^(?:' + '|'.join(re.escape(prefix) for prefix in NON_CATEGORY_PREFIXES) + r')\d+$'
+)
+
+# Static lookups derived once at import time (process lifetime) instead of per article
+# Reverse map of every lowercased synonym to its normalized key; built from the rules
+# in reverse order so that, as before, the first matching rule wins
+SYNONYM_TO_KEY: Dict[str, str] = {
+    synonym.lower(): key
+    for key, synonyms in reversed(NORMALIZATION_RULES.items())
+    for synonym in synonyms
+}
+
+# All regions fused into one alternation, so a segment is scanned once instead of once per
+# region. The lookarounds ensure a region only matches as a complete segment to prevent
+# partial matches; every match is therefore a whole [\w-] run, and findall returns each
+# region occurring in the text.
+REGION_RE = re.compile(
+    r'(?<![\w-])(?:' + '|'.join(re.escape(region) for region in REGIONAL_LOCATIONS) + r')(?![\w-])'
+)
+
+# Splits off scheme and host and stops at query/fragment, like urlparse(url).path
+URL_PATH_RE = re.compile(r'^(?:[A-Za-z][\w+.-]*:)?(?://[^/?#]*)?([^?#]*)')
+
+# Derived columns added to the articles frame for filtering and charts, not for display
+HELPER_COLUMNS: List[str] = ['Hour', 'Search_Text']
+
+# Conditional GETs make a refresh of unchanged feeds cheap, so the parsed articles can be
+# refreshed every few minutes
+FEED_CACHE_TTL = 300
+
+# Number of leading bytes of a download inspected to tell RSS/Atom feeds from sitemaps
+FEED_SNIFF_BYTES = 1024
+
+SITEMAP_NAMESPACES: Dict[str, str] = {
+    's': 'http://www.sitemaps.org/schemas/sitemap/0.9',
+    'news': 'http://www.google.com/schemas/sitemap-news/0.9'
+}
+
+SITEMAP_URL_TAG = f"{{{SITEMAP_NAMESPACES['s']}}}url"
+
+# Compiled once and reused for every <url> element; string() yields '' for missing nodes
+SITEMAP_LOC_XPATH = etree.XPath('string(s:loc)', namespaces=SITEMAP_NAMESPACES, smart_strings=False)
+SITEMAP_KEYWORDS_XPATH = etree.XPath('string(news:news/news:keywords)', namespaces=SITEMAP_NAMESPACES, smart_strings=False)
+SITEMAP_PUBLICATION_DATE_XPATH = etree.XPath('string(news:news/news:publication_date)', namespaces=SITEMAP_NAMESPACES, smart_strings=False)
+SITEMAP_TITLE_XPATH = etree.XPath('string(news:news/news:title)', namespaces=SITEMAP_NAMESPACES, smart_strings=False)
 
-COMPILED_NON_CATEGORY_PATTERNS: List[Any] = [re.compile(pattern) for pattern in NON_CATEGORY_PATTERNS]
+FEED_NAMESPACES: Dict[str, str] = {
+    'atom': 'http://www.w3.org/2005/Atom',
+    'rss1': 'http://purl.org/rss/1.0/',
+    'dc': 'http://purl.org/dc/elements/1.1/'
+}
+
+
+def _feed_xpath(path: str) -> Any:
+    return etree.XPath(path, namespaces=FEED_NAMESPACES, smart_strings=False)
+
+
+# Per item element (RSS 2.0 <item>, Atom <entry>, RSS 1.0 <item>): the compiled queries for
+# the only fields the app reads; alternatives are tried in order until one is non-empty
+FEED_ITEM_FIELDS: Dict[str, Dict[str, Tuple[Any, ...]]] = {
+    'item': {
+        'title': (_feed_xpath('string(title)'),),
+        'link': (_feed_xpath('string(link)'),),
+        'description': (_feed_xpath('string(description)'),),
+        'keywords': (_feed_xpath('category/text() | dc:subject/text()'),),
+        'publication_date': (_feed_xpath('string(pubDate)'), _feed_xpath('string(dc:date)'))
+    },
+    f"{{{FEED_NAMESPACES['atom']}}}entry": {
+        'title': (_feed_xpath('string(atom:title)'),),
+        'link': (_feed_xpath("string(atom:link[not(@rel) or @rel='alternate']/@href)"),),
+        'description': (_feed_xpath('string(atom:summary)'), _feed_xpath('string(atom:content)')),
+        'keywords': (_feed_xpath('atom:category/@term'),),
+        'publication_date': (_feed_xpath('string(atom:published)'), _feed_xpath('string(atom:updated)'))
+    },
+    f"{{{FEED_NAMESPACES['rss1']}}}item": {
+        'title': (_feed_xpath('string(rss1:title)'),),
+        'link': (_feed_xpath('string(rss1:link)'),),
+        'description': (_feed_xpath('string(rss1:description)'),),
+        'keywords': (_feed_xpath('dc:subject/text()'),),
+        'publication_date': (_feed_xpath('string(dc:date)'),)
+    }
+}
+
+REQUEST_TIMEOUT = 10  # seconds per feed download
+MAX_FEED_WORKERS = 32
+
+# One session for all feed downloads: keep-alive connections (and TLS sessions) are reused
+# across feeds and runs instead of opening a new connection per request. The pool is sized
+# for the ingest workers, which share it.
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.headers.update({'User-Agent': 'themen-suche/1.0', 'Accept-Encoding': 'gzip, deflate'})
+HTTP_SESSION.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=MAX_FEED_WORKERS))
+HTTP_SESSION.mount('http://', HTTPAdapter(pool_connections=16, pool_maxsize=MAX_FEED_WORKERS))
+
+# On-disk store of the last downloaded body per feed URL together with its validators,
+# used for conditional GETs (If-None-Match / If-Modified-Since) across app restarts.
+# It lives in the user's own cache directory and holds only raw bytes and JSON (nothing
+# is unpickled), so a file planted by another user cannot run code on load.
+FEED_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'themen-suche', 'feeds'
+)
+
+# How long the last downloaded body may stand in for a feed whose download fails (in
+# seconds since it was last fetched or confirmed by a 304); older copies are not served
+FEED_CACHE_MAX_AGE = 6 * 60 * 60
 
 # ----------------------------- Helper Functions ----------------------------- #
 
-@st.cache_data(ttl=3600)
-def determine_feed_type(feed_url: str) -> str:
-    try:
-        feed = feedparser.parse(feed_url)
-        if feed.bozo:
-            return 'sitemap'
-        elif hasattr(feed, 'entries') and len(feed.entries) > 0 and hasattr(feed.entries[0], 'link'):
-            return 'rss'
-        else:
-            return 'sitemap'
-    except Exception:
+def report_error(message: str, errors: Optional[List[str]] = None) -> None:
+    # Feed workers collect their errors in a list, which the caller prints and adds to the
+    # processing log after the pool has joined; direct calls without a list print right away
+    if errors is None:
+        print(message)
+    else:
+        errors.append(message)
+
+
+def determine_feed_type(content: bytes) -> str:
+    # Sniff the root element of the already downloaded body instead of fetching the feed again
+    head = content[:FEED_SNIFF_BYTES].lower()
+    if b'<urlset' in head or b'<sitemapindex' in head:
         return 'sitemap'
+    if b'<rss' in head or b'<feed' in head or b'<rdf:rdf' in head:
+        return 'rss'
+    return 'sitemap'
+
+
+def _feed_cache_paths(feed_url: str) -> Tuple[str, str]:
+    # Body and validators of a feed, stored under a hash of its URL
+    key = hashlib.sha256(feed_url.encode('utf-8')).hexdigest()
+    return os.path.join(FEED_CACHE_DIR, f'{key}.xml'), os.path.join(FEED_CACHE_DIR, f'{key}.json')
 
 
-@st.cache_data(ttl=3600)
-def extract_urls_from_rss(feed_url: str) -> List[Dict[str, Any]]:
+def _write_cache_file(path: str, data: bytes) -> None:
+    # Write to a temporary file and rename it into place, so readers (and concurrent
+    # workers) never see a partially written file
+    fd, temp_path = tempfile.mkstemp(dir=FEED_CACHE_DIR)
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            temp_file.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def load_cached_feed(feed_url: str, errors: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    content_path, validators_path = _feed_cache_paths(feed_url)
+    try:
+        with open(validators_path, encoding='utf-8') as validators_file:
+            validators = json.load(validators_file)
+        with open(content_path, 'rb') as content_file:
+            content = content_file.read()
+        # The body's mtime records when the server last delivered or confirmed it
+        fetched_at = os.path.getmtime(content_path)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        report_error(f"Error reading feed cache for {feed_url}: {e}", errors)
+        return None
+    return {
+        'etag': validators.get('etag'),
+        'last_modified': validators.get('last_modified'),
+        'content': content,
+        'fetched_at': fetched_at
+    }
+
+
+def store_cached_feed(feed_url: str, cached_feed: Dict[str, Any], errors: Optional[List[str]] = None) -> None:
+    content_path, validators_path = _feed_cache_paths(feed_url)
+    validators = {'etag': cached_feed['etag'], 'last_modified': cached_feed['last_modified']}
+    try:
+        os.makedirs(FEED_CACHE_DIR, mode=0o700, exist_ok=True)
+        # Body first: validators that are older than the body only cost a full download
+        _write_cache_file(content_path, cached_feed['content'])
+        _write_cache_file(validators_path, json.dumps(validators).encode('utf-8'))
+    except Exception as e:
+        report_error(f"Error writing feed cache for {feed_url}: {e}", errors)
+
+
+def touch_cached_feed(feed_url: str, errors: Optional[List[str]] = None) -> None:
+    # A 304 confirms the cached body is current, so it counts as freshly fetched again
+    content_path, _ = _feed_cache_paths(feed_url)
+    try:
+        os.utime(content_path)
+    except Exception as e:
+        report_error(f"Error writing feed cache for {feed_url}: {e}", errors)
+
+
+def fetch_feed(feed_url: str, errors: Optional[List[str]] = None) -> bytes:
+    cached_feed = load_cached_feed(feed_url, errors)
+    headers = {}
+    if cached_feed:
+        if cached_feed['etag']:
+            headers['If-None-Match'] = cached_feed['etag']
+        if cached_feed['last_modified']:
+            headers['If-Modified-Since'] = cached_feed['last_modified']
+
+    try:
+        response = HTTP_SESSION.get(feed_url, headers=headers, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304 and cached_feed:
+            touch_cached_feed(feed_url, errors)
+            return cached_feed['content']
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        cache_age = time.time() - cached_feed['fetched_at'] if cached_feed else None
+        if cache_age is not None and cache_age <= FEED_CACHE_MAX_AGE:
+            # Serve the last good body rather than dropping the feed until it recovers
+            report_error(
+                f"Error downloading feed {feed_url}, using the cached copy from "
+                f"{cache_age / 60:.0f} minutes ago: {e}", errors
+            )
+            return cached_feed['content']
+        report_error(f"Error downloading feed {feed_url}: {e}", errors)
+        return b''
+
+    # Store every delivered body, even without validators: the cache must always hold the
+    # body the app last showed, and stale validators must not be sent again
+    store_cached_feed(feed_url, {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'content': response.content
+    }, errors)
+    return response.content
+
+
+def _first_feed_field(element: Any, xpaths: Tuple[Any, ...]) -> str:
+    for xpath in xpaths:
+        value = xpath(element).strip()
+        if value:
+            return value
+    return ''
+
+
+def parse_feed_items(content: bytes) -> List[Dict[str, Any]]:
+    # Targeted extraction of the few fields the app uses; raises XMLSyntaxError on
+    # malformed feeds so the caller can fall back to feedparser
+    articles = []
+    for _, item in etree.iterparse(BytesIO(content), events=('end',), tag=tuple(FEED_ITEM_FIELDS)):
+        fields = FEED_ITEM_FIELDS[item.tag]
+        articles.append({
+            'link': _first_feed_field(item, fields['link']),
+            'title': _first_feed_field(item, fields['title']),
+            'description': _first_feed_field(item, fields['description']),
+            'keywords': [keyword.strip() for keyword in fields['keywords'][0](item) if keyword.strip()],
+            'publication_date': _first_feed_field(item, fields['publication_date'])
+        })
+        item.clear()
+        while item.getprevious() is not None:
+            del item.getparent()[0]
+    return articles
+
+
+def extract_urls_from_rss(feed_url: str, content: bytes, errors: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    try:
+        return parse_feed_items(content)
+    except etree.XMLSyntaxError as e:
+        report_error(f"Falling back to feedparser for RSS feed {feed_url}: {e}", errors)
+
     articles = []
     try:
-        feed = feedparser.parse(feed_url)
+        feed = feedparser.parse(content)
         for entry in feed.entries:
             keywords = [tag.term for tag in entry.tags if 'term' in tag] if 'tags' in entry else []
             publication_date_str = entry.get('published', entry.get('updated', ''))
-            pub_date = parse_datetime(publication_date_str)
             news_title = entry.get('title', '')
             articles.append({
                 'link': entry.get('link', ''),
                 'title': news_title,
                 'description': entry.get('description', ''),
                 'keywords': keywords,
-                'publication_date': pub_date
+                'publication_date': publication_date_str
             })
     except Exception as e:
-        print(f"Error parsing RSS feed {feed_url}: {e}")
+        report_error(f"Error parsing RSS feed {feed_url}: {e}", errors)
     return articles
 
 
-@st.cache_data(ttl=3600)
-def extract_urls_from_sitemap(feed_url: str) -> List[Dict[str, Any]]:
+def extract_urls_from_sitemap(feed_url: str, content: bytes, errors: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     entries = []
     try:
-        response = requests.get(feed_url)
-        response.raise_for_status()
-        root = ET.fromstring(response.content)
-        namespace = {
-            's': 'http://www.sitemaps.org/schemas/sitemap/0.9',
-            'news': 'http://www.google.com/schemas/sitemap-news/0.9'
-        }
-        for url in root.findall('s:url', namespaces=namespace):
-            loc = url.find('s:loc', namespaces=namespace)
-            loc_text = loc.text if loc is not None else ''
-            keywords_elem = url.find('news:news/news:keywords', namespaces=namespace)
-            keywords = [kw.strip().lower() for kw in keywords_elem.text.split(',')] if keywords_elem is not None and keywords_elem.text else []
-            publication_date_str = url.find('news:news/news:publication_date', namespaces=namespace)
-            publication_date = parse_iso_datetime(publication_date_str.text) if publication_date_str is not None and publication_date_str.text else None
-            news_title_elem = url.find('news:news/news:title', namespaces=namespace)
-            news_title = news_title_elem.text if news_title_elem is not None and news_title_elem.text else ''
+        # Stream-parse <url> elements and free each one once it has been read,
+        # so the tree never holds more than the entry currently being processed
+        for _, url in etree.iterparse(BytesIO(content), events=('end',), tag=SITEMAP_URL_TAG):
+            keywords_text = SITEMAP_KEYWORDS_XPATH(url)
+            keywords = [kw.strip().lower() for kw in keywords_text.split(',')] if keywords_text else []
             entries.append({
-                'loc': loc_text,
+                'loc': SITEMAP_LOC_XPATH(url),
                 'keywords': keywords,
-                'publication_date': publication_date,
-                'news_title': news_title
+                'publication_date': SITEMAP_PUBLICATION_DATE_XPATH(url) or None,
+                'news_title': SITEMAP_TITLE_XPATH(url)
             })
+            url.clear()
+            while url.getprevious() is not None:
+                del url.getparent()[0]
     except Exception as e:
-        print(f"Error parsing Sitemap {feed_url}: {e}")
+        report_error(f"Error parsing Sitemap {feed_url}: {e}", errors)
     return entries
 
 
-def parse_datetime(date_str: str) -> Any:
-    try:
-        return datetime.strptime(date_str, "%a, %d %b %Y %H:%M:%S %Z").astimezone(timezone.utc).replace(tzinfo=None)
-    except ValueError:
-        return None
-
-
-def parse_iso_datetime(date_str: str) -> Any:
-    try:
-        return datetime.fromisoformat(date_str.replace("Z", "+00:00")).astimezone(timezone.utc).replace(tzinfo=None)
-    except ValueError:
-        return None
+def extract_url_path(url: str) -> str:
+    return URL_PATH_RE.match(url).group(1)
 
 
 def extract_categories(url: str) -> List[str]:
     try:
-        parsed_url = urlparse(url)
-        path = parsed_url.path
+        path = extract_url_path(url)
         parts = [part for part in path.split('/') if part]
         potential_categories = parts[:-1]  # Exclude the last part which is typically the article
-        categories = [cat for cat in potential_categories if not any(pattern.match(cat) for pattern in COMPILED_NON_CATEGORY_PATTERNS)]
+        categories = [cat for cat in potential_categories if not NON_CATEGORY_RE.match(cat)]
         return categories
     except Exception as e:
         print(f"Error parsing URL {url}: {e}")
         return []
 
-def normalize_categories(categories: List[str], url: str) -> List[str]:
+
+def extract_categories_column(urls: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    # Column-wise equivalent of extract_categories: split all URL paths into one long
+    # Series of segments, filter it with vectorized masks and regroup per article
+    paths = urls.fillna('').str.extract(URL_PATH_RE, expand=False).fillna('')
+    segments = paths.str.split('/').explode()
+    segments = segments[segments.notna() & (segments != '')]
+    # Exclude the last segment of every path, which is typically the article
+    segments = segments[segments.index.duplicated(keep='last')]
+    segments = segments[~segments.str.match(NON_CATEGORY_RE)]
+    grouped = segments.groupby(level=0).agg(list)
+    categories = pd.Series([grouped.get(idx, []) for idx in urls.index], index=urls.index, dtype=object)
+    return categories, paths
+
+@lru_cache(maxsize=16384)
+def find_regions(segment: str) -> Tuple[str, ...]:
+    # Region names never contain '/', so matching a path segment by segment finds the same
+    # regions as matching the whole path. Segments such as 'politik' or 'nrw' repeat across
+    # thousands of articles, so the per-segment result is memoized.
+    if segment in REGIONAL_LOCATION_SET:
+        # The usual case: the segment is the region itself, no other region can match in it
+        return (segment,)
+    return tuple(set(REGION_RE.findall(segment)))
+
+
+def normalize_categories(categories: List[str], url_path: str) -> List[str]:
     normalized: set = set()
 
     # Step 1: Normalize general categories without dropping regional
-    for cat in categories:
-        cat_lower = cat.lower()
-        matched = False
-        for key, synonyms in NORMALIZATION_RULES.items():
-            if cat_lower in [syn.lower() for syn in synonyms]:
-                normalized.add(key)
-                matched = True
-                break
-        if not matched:
-            normalized.add(cat_lower)
-
-    # Step 2: Extract specific regional locations from URL and categories
-    url_path = urlparse(url).path.lower()
-
-    for region in REGIONAL_LOCATIONS:
-        # Ensure 'region' is a complete segment to prevent partial matches
-        pattern = rf'(?<![\w-]){re.escape(region)}(?![\w-])'
-        if re.search(pattern, url_path) or any(re.search(pattern, cat.lower()) for cat in categories):
-            normalized.add(region)
+    categories_lower = [cat.lower() for cat in categories]
+    normalized.update(SYNONYM_TO_KEY.get(cat, cat) for cat in categories_lower)
+
+    # Step 2: Extract specific regional locations from the URL path and categories
+    for segment in set(url_path.lower().split('/')).union(categories_lower):
+        if segment:
+            normalized.update(find_regions(segment))
 
     # Step 3: Retain "regional" if it exists alongside other categories
     if "regional" in categories or "regionales" in categories:
@@ -192,47 +433,103 @@ def normalize_categories(categories: List[str], url: str) -> List[str]:
 
     return list(normalized)
 
-@st.cache_data(ttl=3600)
-def get_all_articles() -> Tuple[pd.DataFrame, List[str]]:
-    all_articles: List[Dict[str, Any]] = []
+def build_category_matrix(normalized_categories: pd.Series) -> pd.DataFrame:
+    # One boolean column per normalized category (one-hot per article), so category
+    # filters become column selections instead of a Python membership test per row
+    exploded = normalized_categories.explode().dropna()
+    return (
+        pd.get_dummies(exploded, dtype=bool)
+        .groupby(level=0)
+        .any()
+        .reindex(normalized_categories.index, fill_value=False)
+    )
+
+def count_categories(category_matrix: pd.DataFrame) -> pd.Series:
+    # Articles per category from the one-hot matrix, most frequent first (ties keep column order)
+    counts = category_matrix.sum()
+    return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+@lru_cache(maxsize=16)
+def parse_feed(feed_type: str, feed_url: str, content: bytes) -> Tuple[Dict[str, Tuple[Any, ...]], Tuple[str, ...]]:
+    # Memoized on the downloaded bytes: a feed that comes back unchanged (e.g. 304 Not
+    # Modified, answered from the disk cache) is not parsed again on the next refresh.
+    # The feed is assembled column by column, one sequence per column rather than one dict
+    # per article. The cached columns are shared between calls, hence tuples instead of
+    # lists; parse errors are cached along with them so they are reported on every refresh.
+    errors: List[str] = []
+    if not content:
+        # Nothing was downloaded; fetch_feed has already reported why
+        return {'URL': (), 'Title': (), 'Keywords': (), 'Publication_Date': ()}, ()
+    if feed_type == 'rss':
+        articles = extract_urls_from_rss(feed_url, content, errors)
+        return {
+            'URL': tuple(article['link'] for article in articles),
+            'Title': tuple(article['title'] for article in articles),
+            'Keywords': tuple(', '.join(article['keywords']) + ', ' + article['description'] for article in articles),
+            'Publication_Date': tuple(article['publication_date'] for article in articles)
+        }, tuple(errors)
+    sitemap_entries = extract_urls_from_sitemap(feed_url, content, errors)
+    return {
+        'URL': tuple(entry['loc'] for entry in sitemap_entries),
+        'Title': tuple(entry['news_title'] for entry in sitemap_entries),
+        'Keywords': tuple(', '.join(entry['keywords']) for entry in sitemap_entries),
+        'Publication_Date': tuple(entry['publication_date'] for entry in sitemap_entries)
+    }, tuple(errors)
+
+def ingest_feed(feed_name: str, feed_type: Optional[str], feed_url: str) -> Tuple[Dict[str, Sequence[Any]], str, List[str]]:
+    # Runs in a worker thread, so nothing is printed here: errors are returned with the
+    # feed's log line and reported by the caller
+    errors: List[str] = []
+    content = fetch_feed(feed_url, errors)
+    if feed_type is None:
+        feed_type = determine_feed_type(content)
+    log_message = f"Processing '{feed_name}' as {feed_type.upper()}..."
+
+    parsed_columns, parse_errors = parse_feed(feed_type, feed_url, content)
+    errors.extend(parse_errors)
+    feed_columns: Dict[str, Sequence[Any]] = dict(parsed_columns)
+    feed_columns['Feed'] = [feed_name] * len(feed_columns['URL'])
+
+    return feed_columns, log_message, errors
+
+def get_all_articles(feeds: Optional[Dict[str, Tuple[Optional[str], str]]] = None) -> Tuple[pd.DataFrame, List[str]]:
+    feeds = FEEDS if feeds is None else feeds
+    columns: Dict[str, List[Any]] = {'Feed': [], 'URL': [], 'Title': [], 'Keywords': [], 'Publication_Date': []}
     log_messages: List[str] = []
 
-    for feed_name, feed_url in FEEDS.items():
-        feed_type = determine_feed_type(feed_url)
-        log_message = f"Processing '{feed_name}' as {feed_type.upper()}..."
-        log_messages.append(log_message)
-
-        if feed_type == 'rss':
-            articles = extract_urls_from_rss(feed_url)
-            for article in articles:
-                categories = extract_categories(article['link'])
-                normalized_categories = normalize_categories(categories, article['link'])
-                combined_keywords = ', '.join(article['keywords']) + ', ' + article['description']
-                all_articles.append({
-                    'Feed': feed_name,
-                    'URL': article['link'],
-                    'Title': article['title'],
-                    'Keywords': combined_keywords,
-                    'Publication_Date': article['publication_date'],
-                    'Categories': categories,
-                    'Normalized_Categories': normalized_categories
-                })
-        else:
-            sitemap_entries = extract_urls_from_sitemap(feed_url)
-            for entry in sitemap_entries:
-                categories = extract_categories(entry['loc'])
-                normalized_categories = normalize_categories(categories, entry['loc'])
-                combined_keywords = ', '.join(entry['keywords'])
-                all_articles.append({
-                    'Feed': feed_name,
-                    'URL': entry['loc'],
-                    'Title': entry['news_title'],
-                    'Keywords': combined_keywords,
-                    'Publication_Date': entry['publication_date'],
-                    'Categories': categories,
-                    'Normalized_Categories': normalized_categories
-                })
-
-    df = pd.DataFrame(all_articles)
+    # Each feed is ingested in its own worker: the downloads are I/O bound, so the
+    # whole run takes roughly as long as the slowest feed instead of the sum of all.
+    # Results, log lines and errors are collected in feed order in this thread, so error
+    # output from different feeds never interleaves.
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_FEED_WORKERS, len(feeds)))) as executor:
+        results = executor.map(lambda feed: ingest_feed(feed[0], *feed[1]), feeds.items())
+        for feed_columns, log_message, errors in results:
+            for column, values in columns.items():
+                values.extend(feed_columns[column])
+            log_messages.append(log_message)
+            for error in errors:
+                print(error)
+                log_messages.append(f"⚠️ {error}")
+
+    df = pd.DataFrame(columns)
+    if df.empty:
+        # No articles at all (e.g. every download failed): empty lists give float columns,
+        # so give the text columns a string dtype for the .str operations below
+        df = df.astype({'URL': 'str', 'Title': 'str', 'Keywords': 'str'})
+    df['Categories'], url_paths = extract_categories_column(df['URL'])
+    df['Normalized_Categories'] = [
+        normalize_categories(categories, url_path)
+        for categories, url_path in zip(df['Categories'], url_paths)
+    ]
     df = df[['Title', 'Feed', 'Keywords', 'Categories', 'Normalized_Categories', 'URL', 'Publication_Date']]
+    # Parse all raw date strings (RFC 822 from RSS, ISO 8601 from sitemaps) in one vectorized pass
+    df['Publication_Date'] = pd.to_datetime(
+        df['Publication_Date'], format='mixed', utc=True, errors='coerce'
+    ).dt.tz_convert(None)
+    df['Hour'] = df['Publication_Date'].dt.hour.astype('Int8')
+    # Only a handful of distinct feed names: store them as small integer codes
+    df['Feed'] = df['Feed'].astype(pd.CategoricalDtype(categories=list(feeds.keys())))
+    # Title and keywords lowercased into one column once, so the search is a single literal
+    # substring scan; the newline separator keeps matches from spanning both fields
+    df['Search_Text'] = (df['Title'].fillna('') + '\n' + df['Keywords'].fillna('')).str.lower()
     return df, log_messages